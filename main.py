@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from src.logger import setup_logger
 from src.config_loader import ConfigLoader
 from src.binance_client import BinanceClientWrapper
@@ -9,6 +10,7 @@ from src.signal_generator import SignalGenerator
 from src.position_manager import PositionManager
 from src.order_manager import OrderManager
 from src.pair_scanner import PairScanner
+from src.stream_manager import StreamManager
 
 def main():
     logger = setup_logger()
@@ -33,7 +35,8 @@ def main():
         api_key=config.api_key,
         api_secret=config.api_secret,
         testnet=config.testnet,
-        logger=logger
+        logger=logger,
+        pool_size=max(32, config.get('binance.max_workers', 16))
     )
     
     indicators_calc = TechnicalIndicators(config, logger)
@@ -70,6 +73,21 @@ def main():
     logger.info(f"    - Scan interval: {config.get('scanner.scan_interval_seconds', 60)}s")
     logger.info(f"    - Volatility filter: ATR > {config.get('volatility.atr_multiplier', 1.5)}× avg")
     
+    # Optional WebSocket feed for prices and klines
+    stream = None
+    if config.get('binance.use_websocket', False):
+        # Held positions may not be in the scanner list but still need live candles
+        stream_symbols = list(dict.fromkeys(scanner_pairs + list(position_mgr.get_open_positions())))
+        stream = StreamManager(
+            binance,
+            stream_symbols,
+            interval=config.get('timeframe', '15m'),
+            testnet=config.testnet,
+            logger=logger
+        )
+        stream.start()
+        binance.attach_stream(stream)
+    
     # Get account balance
     usdt_balance = binance.get_account_balance('USDT')
     logger.info(f"\nUSDT Balance: ${usdt_balance:.2f}")
@@ -83,27 +101,36 @@ def main():
     
     iteration = 0
     
+    # Loop invariants - config does not change while the bot runs
+    timeframe = config.get('timeframe', '15m')
+    max_workers = config.get('binance.max_workers', 16)
+    max_positions = config.get('risk_management.max_positions', 5)
+    check_interval = config.get('bot.check_interval_seconds', 60)
+    
     logger.info("\n" + "=" * 70)
     logger.info("Starting trading loop...")
     logger.info("Press Ctrl+C to stop the bot")
     logger.info("=" * 70 + "\n")
     
+    banner = '=' * 70
+    
+    # Iterations are scheduled on a fixed cadence from this deadline
+    next_tick = time.monotonic()
+    
     try:
         while True:
             iteration += 1
-            logger.info(f"\n{'='*70}")
-            logger.info(f"Iteration #{iteration} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"{'='*70}")
+            logger.info("\n%s\nIteration #%d - %s\n%s", banner, iteration, time.strftime('%Y-%m-%d %H:%M:%S'), banner)
             
             # Check daily P&L and protection modes
             daily_pnl = position_mgr.get_daily_pnl()
-            logger.info(f"Daily P&L: {daily_pnl.get('total_pnl_percent', 0):.2f}% (${daily_pnl.get('realized_pnl_usd', 0):.2f}) | Trades: {daily_pnl.get('trades_count', 0)} (W: {daily_pnl.get('wins', 0)}, L: {daily_pnl.get('losses', 0)})")
+            logger.info("Daily P&L: %.2f%% ($%.2f) | Trades: %s (W: %s, L: %s)", daily_pnl.get('total_pnl_percent', 0), daily_pnl.get('realized_pnl_usd', 0), daily_pnl.get('trades_count', 0), daily_pnl.get('wins', 0), daily_pnl.get('losses', 0))
             
             if position_mgr.is_in_protection_mode():
-                logger.warning(f"⚠️  PROFIT PROTECTION MODE ACTIVE - No new trades (Daily profit: {daily_pnl.get('total_pnl_percent', 0):.2f}%)")
+                logger.warning("⚠️  PROFIT PROTECTION MODE ACTIVE - No new trades (Daily profit: %.2f%%)", daily_pnl.get('total_pnl_percent', 0))
             
             if position_mgr.has_hit_daily_loss_limit():
-                logger.error(f"🛑 DAILY LOSS LIMIT HIT - No new trades (Daily loss: {daily_pnl.get('total_pnl_percent', 0):.2f}%)")
+                logger.error("🛑 DAILY LOSS LIMIT HIT - No new trades (Daily loss: %.2f%%)", daily_pnl.get('total_pnl_percent', 0))
             
             # Scan pairs for opportunities
             if iteration % 5 == 1:  # Rescan every 5 iterations
@@ -115,100 +142,113 @@ def main():
             
             # Get open positions
             open_positions = position_mgr.get_open_positions()
-            logger.info(f"\nOpen Positions: {len(open_positions)}/{config.get('risk_management.max_positions', 5)}")
-            logger.info(f"USDT Balance: ${usdt_balance:.2f}")
+            logger.info("\nOpen Positions: %s/%s", len(open_positions), max_positions)
+            logger.info("USDT Balance: $%.2f", usdt_balance)
+            
+            # Fetch all prices in one request for this iteration
+            prices = binance.get_all_prices()
+            
+            # Fetch klines for held symbols and, when the entry pass would run, entry candidates in one concurrent batch
+            fetch_symbols = list(open_positions)
+            if len(open_positions) < max_positions and not position_mgr.is_in_protection_mode() and not position_mgr.has_hit_daily_loss_limit():
+                fetch_symbols += [p['symbol'] for p in pair_scanner.get_top_pairs() if p['symbol'] not in open_positions]
+            klines_map = binance.get_klines_batch(fetch_symbols, interval=timeframe, limit=100, max_workers=max_workers)
+            # Held positions always get exact indicators, candidates may reuse a near-identical result
+            indicators_map = indicators_calc.calculate_indicators_batch({symbol: klines_map[symbol] for symbol in open_positions if symbol in klines_map})
+            indicators_map.update(indicators_calc.calculate_indicators_batch({symbol: klines for symbol, klines in klines_map.items() if symbol not in open_positions}, reuse=True))
             
             # 1. Manage existing positions
-            for symbol, position in list(open_positions.items()):
+            
+            # Decide exits first; positions are only read here
+            exits = []
+            for symbol, position in open_positions.items():
                 try:
-                    current_price = binance.get_symbol_price(symbol)
+                    quantity = position['quantity']
+                    # The stream snapshot only has symbols that ticked since it (re)connected
+                    current_price = prices.get(symbol) or binance.get_symbol_price(symbol)
                     if not current_price:
-                        logger.warning(f"Skip {symbol}: Could not get price")
+                        logger.warning("Skip %s: Could not get price", symbol)
                         continue
                     
                     # Get fresh indicators
-                    timeframe = config.get('timeframe', '15m')
-                    klines = binance.get_klines(symbol, interval=timeframe, limit=100)
+                    indicators = indicators_map.get(symbol)
                     
-                    if klines:
-                        indicators = indicators_calc.calculate_indicators(klines)
+                    if indicators:
+                        # Update trailing stop with ATR (already computed with the other indicators)
+                        atr_value = indicators.get('atr')
+                        position_mgr.update_trailing_stop(symbol, current_price, atr_value)
                         
-                        if indicators:
-                            # Update trailing stop with ATR
-                            atr_value = indicators_calc.get_atr_for_trailing_stop(klines)
-                            position_mgr.update_trailing_stop(symbol, current_price, atr_value)
-                            
-                            # Check exit signals (RSI reversal, EMA recross)
-                            exit_check = signal_gen.check_exit_signal(position, indicators)
-                            
-                            if exit_check.get('should_exit'):
-                                logger.info(f"📉 Exit signal for {symbol}: {exit_check.get('reason')}")
-                                
-                                close_result = order_mgr.close_position(symbol, position['quantity'])
-                                
-                                if isinstance(close_result, str):
-                                    if close_result in ['PHANTOM_POSITION', 'BELOW_MIN_QTY', 'ZERO_QUANTITY']:
-                                        logger.error(f"Position closure failed: {close_result} - Removing phantom")
-                                        position_mgr.remove_position(symbol, current_price, f"{exit_check.get('reason')}_PHANTOM")
-                                elif close_result:
-                                    position_mgr.remove_position(symbol, close_result, exit_check.get('reason'))
-                                else:
-                                    logger.error(f"Failed to close {symbol} - will retry")
-                                continue
+                        # Check exit signals (RSI reversal, EMA recross)
+                        exit_check = signal_gen.check_exit_signal(position, indicators)
+                        
+                        if exit_check.get('should_exit'):
+                            logger.info("📉 Exit signal for %s: %s", symbol, exit_check.get('reason'))
+                            exits.append((symbol, quantity, current_price, exit_check.get('reason')))
+                            continue
                     
-                    # Check stop loss and trailing stop
+                    # Check stop loss and trailing stop against the same price snapshot - no second lookup
                     should_close, reason = position_mgr.should_close_position(symbol, current_price)
                     
                     if should_close:
-                        logger.info(f"🛑 Stop triggered for {symbol}: {reason}")
-                        
-                        close_result = order_mgr.close_position(symbol, position['quantity'])
+                        logger.info("🛑 Stop triggered for %s: %s", symbol, reason)
+                        exits.append((symbol, quantity, current_price, reason))
+                
+                except Exception as e:
+                    logger.error("Error managing position %s: %s", symbol, e)
+                    continue
+            
+            # Send the close orders concurrently, then record the results one by one
+            if exits:
+                with ThreadPoolExecutor(max_workers=min(len(exits), max_workers)) as executor:
+                    futures = [executor.submit(order_mgr.close_position, symbol, quantity) for symbol, quantity, _, _ in exits]
+                
+                for (symbol, _, current_price, reason), future in zip(exits, futures):
+                    try:
+                        close_result = future.result()
                         
                         if isinstance(close_result, str):
                             if close_result in ['PHANTOM_POSITION', 'BELOW_MIN_QTY', 'ZERO_QUANTITY']:
-                                logger.error(f"Position closure failed: {close_result} - Removing phantom")
+                                logger.error("Position closure failed: %s - Removing phantom", close_result)
                                 position_mgr.remove_position(symbol, current_price, f"{reason}_PHANTOM")
                         elif close_result:
                             position_mgr.remove_position(symbol, close_result, reason)
                         else:
-                            logger.error(f"Failed to close {symbol} - will retry")
-                
-                except Exception as e:
-                    logger.error(f"Error managing position {symbol}: {e}")
-                    continue
+                            logger.error("Failed to close %s - will retry", symbol)
+                    
+                    except Exception as e:
+                        logger.error("Error managing position %s: %s", symbol, e)
             
-            # 2. Look for new entry opportunities
-            if not position_mgr.is_in_protection_mode() and not position_mgr.has_hit_daily_loss_limit():
-                # Get top pairs from scanner
+            # 2. Look for new entry opportunities (skipped entirely when at max positions)
+            if len(open_positions) < max_positions and not position_mgr.is_in_protection_mode() and not position_mgr.has_hit_daily_loss_limit():
+                # Top pairs from scanner that we do not hold yet
                 top_pairs = pair_scanner.get_top_pairs()
+                candidates = [p['symbol'] for p in top_pairs if p['symbol'] not in open_positions]
                 
-                for pair_data in top_pairs:
-                    symbol = pair_data['symbol']
+                # Candidates not covered by the batch above (a slot was freed this iteration)
+                missing = [symbol for symbol in candidates if symbol not in klines_map]
+                if missing:
+                    missing_klines = binance.get_klines_batch(missing, interval=timeframe, limit=100, max_workers=max_workers)
+                    klines_map.update(missing_klines)
+                    indicators_map.update(indicators_calc.calculate_indicators_batch(missing_klines, reuse=True))
+                
+                for symbol in candidates:
+                    # Stop once new entries have filled the remaining slots
+                    if len(open_positions) >= max_positions:
+                        break
                     
                     try:
-                        # Skip if already have position
-                        if position_mgr.has_position(symbol):
-                            continue
-                        
                         # Check if can open new position
                         can_open, reason = position_mgr.can_open_new_position(symbol)
                         if not can_open:
-                            logger.debug(f"Skip {symbol}: {reason}")
+                            logger.debug("Skip %s: %s", symbol, reason)
                             continue
                         
                         # Get fresh data
-                        current_price = binance.get_symbol_price(symbol)
+                        current_price = prices.get(symbol)
                         if not current_price:
                             continue
                         
-                        timeframe = config.get('timeframe', '15m')
-                        klines = binance.get_klines(symbol, interval=timeframe, limit=100)
-                        
-                        if not klines:
-                            continue
-                        
-                        # Calculate indicators
-                        indicators = indicators_calc.calculate_indicators(klines)
+                        indicators = indicators_map.get(symbol)
                         
                         if not indicators:
                             continue
@@ -218,34 +258,37 @@ def main():
                         
                         if signal in ['BUY', 'SELL']:
                             # Log signal details
-                            logger.info(f"\n{'🟢 BUY' if signal == 'BUY' else '🔴 SELL'} signal for {symbol} @ {current_price:.8f}")
-                            logger.info(f"  EMA Fast (21): {indicators.get('ema_fast', 0):.8f}")
-                            logger.info(f"  EMA Slow (49): {indicators.get('ema_slow', 0):.8f}")
-                            logger.info(f"  RSI: {indicators.get('rsi', 0):.2f}")
-                            logger.info(f"  EMA Crossover: {indicators.get('ema_crossover_up' if signal == 'BUY' else 'ema_crossover_down', False)}")
-                            logger.info(f"  Heiken Ashi: {'Bullish' if indicators.get('ha_bullish') else 'Bearish' if indicators.get('ha_bearish') else 'Neutral'}")
-                            logger.info(f"  ATR: {indicators.get('atr', 0):.8f}")
-                            logger.info(f"  Volatility Filter: {'✓ PASS' if indicators.get('passes_volatility_filter') else '✗ FAIL'}")
+                            logger.info("\n%s signal for %s @ %.8f", '🟢 BUY' if signal == 'BUY' else '🔴 SELL', symbol, current_price)
+                            logger.info("  EMA Fast (21): %.8f", indicators.get('ema_fast', 0))
+                            logger.info("  EMA Slow (49): %.8f", indicators.get('ema_slow', 0))
+                            logger.info("  RSI: %.2f", indicators.get('rsi', 0))
+                            logger.info("  EMA Crossover: %s", indicators.get('ema_crossover_up' if signal == 'BUY' else 'ema_crossover_down', False))
+                            logger.info("  Heiken Ashi: %s", 'Bullish' if indicators.get('ha_bullish') else 'Bearish' if indicators.get('ha_bearish') else 'Neutral')
+                            logger.info("  ATR: %.8f", indicators.get('atr', 0))
+                            logger.info("  Volatility Filter: %s", '✓ PASS' if indicators.get('passes_volatility_filter') else '✗ FAIL')
                             
                             # Calculate position size
                             quantity, position_value_usd = position_mgr.calculate_position_size(current_price, usdt_balance)
                             
-                            logger.info(f"  Position Size: ${position_value_usd:.2f} ({position_mgr.position_size_percent}% of ${usdt_balance:.2f})")
-                            logger.info(f"  Quantity: {quantity:.8f}")
+                            logger.info("  Position Size: $%.2f (%s%% of $%.2f)", position_value_usd, position_mgr.position_size_percent, usdt_balance)
+                            logger.info("  Quantity: %.8f", quantity)
                             
                             # Place market order
                             if signal == 'BUY':
-                                order_result = order_mgr.place_market_buy(symbol, position_value_usd)
+                                order_result = order_mgr.place_market_buy(symbol, position_value_usd, reference_price=current_price)
                             else:
                                 # For SELL signals, we would need to short (not implemented for spot)
-                                logger.info(f"  SELL signal detected but shorting not available on spot - skipping")
+                                logger.info("  SELL signal detected but shorting not available on spot - skipping")
                                 continue
                             
                             if order_result:
                                 executed_qty = order_result.get('quantity', 0)
                                 
                                 if executed_qty > 0:
-                                    logger.info(f"✓ Order executed: {symbol} {signal} - Qty: {executed_qty}, Price: {order_result['price']:.8f}")
+                                    logger.info("✓ Order executed: %s %s - Qty: %s, Price: %.8f", symbol, signal, executed_qty, order_result['price'])
+                                    
+                                    # Debit locally - balance is re-read from Binance next iteration
+                                    usdt_balance -= executed_qty * order_result['price']
                                     
                                     try:
                                         position_mgr.add_position(
@@ -255,32 +298,41 @@ def main():
                                             side=signal,
                                             order_id=order_result.get('order_id')
                                         )
-                                        logger.info(f"✓ Position {symbol} saved successfully")
-                                        
-                                        # Update balance
-                                        usdt_balance = binance.get_account_balance('USDT')
+                                        logger.info("✓ Position %s saved successfully", symbol)
                                         
                                     except Exception as save_error:
-                                        logger.error(f"✗ CRITICAL: Position save failed for {symbol}!")
-                                        logger.error(f"✗ Order executed on Binance but NOT saved!")
-                                        logger.error(f"✗ Manual intervention required!")
-                                        logger.error(f"✗ Error: {save_error}")
+                                        logger.error("✗ CRITICAL: Position save failed for %s!", symbol)
+                                        logger.error("✗ Order executed on Binance but NOT saved!")
+                                        logger.error("✗ Manual intervention required!")
+                                        logger.error("✗ Error: %s", save_error)
                                 else:
-                                    logger.error(f"✗ PREVENTED phantom position: {symbol} executedQty=0")
+                                    logger.error("✗ PREVENTED phantom position: %s executedQty=0", symbol)
                             else:
-                                logger.warning(f"Failed to place order for {symbol}")
+                                logger.warning("Failed to place order for %s", symbol)
                         
                         else:
-                            logger.debug(f"Skip {symbol}: Signal={signal}")
+                            logger.debug("Skip %s: Signal=%s", symbol, signal)
                     
                     except Exception as e:
-                        logger.error(f"Error processing {symbol}: {e}")
+                        logger.error("Error processing %s: %s", symbol, e)
                         continue
             
-            # Sleep before next iteration
-            check_interval = config.get('bot.check_interval_seconds', 60)
-            logger.info(f"\n⏱️  Waiting {check_interval}s until next check...")
-            time.sleep(check_interval)
+            # Sleep until the next deadline - time spent in this iteration counts against it
+            next_tick += check_interval
+            wait_seconds = next_tick - time.monotonic()
+            if wait_seconds < 0:
+                # Overran a whole interval - restart the cadence instead of bursting to catch up
+                logger.warning("Iteration #%d overran the %ss check interval by %.1fs", iteration, check_interval, -wait_seconds)
+                next_tick = time.monotonic()
+                wait_seconds = 0
+            
+            if stream:
+                logger.info("\n⏱️  Waiting up to %.1fs for next candle close...", wait_seconds)
+                if stream.wait_for_candle_close(wait_seconds):
+                    next_tick = time.monotonic()
+            else:
+                logger.info("\n⏱️  Waiting %.1fs until next check...", wait_seconds)
+                time.sleep(wait_seconds)
     
     except KeyboardInterrupt:
         logger.info("\n" + "="*70)
@@ -299,8 +351,9 @@ def main():
         
         if open_positions:
             logger.info(f"\n  Open Positions: {len(open_positions)}")
+            prices = binance.get_all_prices()
             for symbol, pos in open_positions.items():
-                current_price = binance.get_symbol_price(symbol)
+                current_price = prices.get(symbol) or binance.get_symbol_price(symbol)
                 if current_price:
                     side = pos.get('side', 'BUY')
                     if side == 'BUY':
@@ -312,10 +365,24 @@ def main():
         else:
             logger.info(f"\n  No open positions")
         
+        if stream:
+            stream.stop()
+        
+        try:
+            position_mgr.close()
+        except Exception as e:
+            logger.error("Could not compact positions journal: %s", e)
+        
         logger.info("\nBot shutdown complete")
     
     except Exception as e:
         logger.error(f"Unexpected error in main loop: {e}", exc_info=True)
+        if stream:
+            stream.stop()
+        try:
+            position_mgr.close()
+        except Exception as close_error:
+            logger.error("Could not compact positions journal: %s", close_error)
         sys.exit(1)
 
 if __name__ == "__main__":
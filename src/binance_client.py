@@ -1,53 +1,200 @@
 from binance.client import Client
-from binance.exceptions import BinanceAPIException
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import logging
+import numpy as np
+import threading
 import time
 
+# Fast JSON parser for REST responses: orjson, then ujson, else python-binance's default
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        _json_loads = ujson.loads
+    except ImportError:
+        _json_loads = None
+
+# Stand-in when no logger is given, so methods can log unconditionally
+_null_logger = logging.getLogger(__name__)
+_null_logger.addHandler(logging.NullHandler())
+_null_logger.propagate = False
+
+# Symbols excluded from the top volume scan
+STABLECOIN_PREFIXES = ('USDT', 'USDC', 'BUSD', 'TUSD', 'USDP', 'DAI', 'FDUSD')
+LEVERAGED_TOKENS = ('UP', 'DOWN', 'BEAR', 'BULL')
+
+def _top_n_indices(values, n):
+    """
+    Indices of the n largest values, largest first
+    O(len) partition to find them, then only those n are sorted
+    """
+    if n <= 0:
+        return []
+    
+    if len(values) > n:
+        idx = np.argpartition(values, -n)[-n:]
+    else:
+        idx = np.arange(len(values))
+    
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+class BinanceRestClient(Client):
+    """python-binance Client that parses responses with orjson/ujson when one is installed"""
+    
+    @staticmethod
+    def _handle_response(response):
+        if _json_loads is None:
+            return Client._handle_response(response)
+        
+        if not (200 <= response.status_code < 300):
+            raise BinanceAPIException(response, response.status_code, response.text)
+        
+        # Parse the raw bytes directly, skipping the text decode
+        if not response.content:
+            return {}
+        
+        try:
+            return _json_loads(response.content)
+        except ValueError:
+            raise BinanceRequestException(f"Invalid Response: {response.text}")
+
 class BinanceClientWrapper:
-    def __init__(self, api_key, api_secret, testnet=False, logger=None):
-        self.logger = logger
-        self.client = Client(api_key, api_secret, testnet=testnet)
-        if self.logger:
-            self.logger.info(f"Binance client initialized (Testnet: {testnet})")
+    def __init__(self, api_key, api_secret, testnet=False, logger=None, pool_size=32):
+        self.logger = logger if logger is not None else _null_logger
+        self.client = BinanceRestClient(api_key, api_secret, testnet=testnet)
+        
+        # Keep-alive connection pool sized for the kline fetch threads
+        # Idempotent requests (GET/DELETE) are retried on connection errors and
+        # transient 5xx responses, orders are not. 429/418 are left to the caller
+        # since retrying a rate limit only deepens the ban
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self.client.session.mount('https://', adapter)
+        self.client.session.headers['Connection'] = 'keep-alive'
+        
+        # Rolling kline windows keyed by (symbol, interval)
+        self._klines_cache = {}
+        self._klines_lock = threading.Lock()
+        
+        # Last REST refresh per window - the scanner and the trading loop ask
+        # for the same symbols seconds apart, so recent windows are served as-is
+        self._klines_refreshed = {}
+        self.klines_min_refresh_seconds = 5
+        
+        # Persistent fetch pools keyed by worker count
+        self._fetch_executors = {}
+        
+        # Optional WebSocket feed (see StreamManager)
+        self.stream = None
+        
+        # Last top volume pairs result: (timestamp, top_n, quote_asset, pairs)
+        self._top_cache = None
+        
+        # Last all-symbol price snapshot: (timestamp, {symbol: price})
+        self._prices_cache = None
+        
+        # Symbol metadata (filters, precision) by symbol
+        self._symbol_info_cache = {}
+        
+        # Asset balances: asset -> (monotonic time, balance), cleared on order actions
+        self._balance_cache = {}
+        self.balance_ttl = 2.0
+        
+        self.logger.info("Binance client initialized (Testnet: %s)", testnet)
     
-    def get_top_volume_pairs(self, top_n=20, quote_asset='USDT'):
+    def get_top_volume_pairs(self, top_n=20, quote_asset='USDT', cache_ttl=600):
+        if self._top_cache:
+            cached_time, cached_n, cached_quote, cached_pairs = self._top_cache
+            if (cached_n, cached_quote) == (top_n, quote_asset) and time.monotonic() - cached_time < cache_ttl:
+                return cached_pairs
+        
         try:
-            tickers = self.client.get_ticker()
-            
-            stablecoins = ['USDT', 'USDC', 'BUSD', 'TUSD', 'USDP', 'DAI', 'FDUSD']
+            # 24h quote volumes from the ticker stream when it is live, else one REST call
+            # (the stream only pushes symbols that traded, which always covers the top N)
+            if self.stream is not None and self.stream.has_fresh_prices():
+                quote_volumes = self.stream.get_quote_volumes().items()
+            else:
+                quote_volumes = ((ticker['symbol'], ticker['quoteVolume']) for ticker in self.client.get_ticker())
             
-            usdt_pairs = [
-                ticker for ticker in tickers 
-                if ticker['symbol'].endswith(quote_asset) and 
-                not any(x in ticker['symbol'] for x in ['UP', 'DOWN', 'BEAR', 'BULL']) and
-                not any(ticker['symbol'].startswith(stable) for stable in stablecoins)
-            ]
+            # Single pass filter, volumes are converted in bulk afterwards
+            symbols = []
+            volumes = []
+            for symbol, quote_volume in quote_volumes:
+                # Halted or delisted pairs report an all-zero volume ('0.00000000')
+                if not quote_volume.strip('0.'):
+                    continue
+                if not symbol.endswith(quote_asset) or symbol.startswith(STABLECOIN_PREFIXES):
+                    continue
+                # Leveraged tokens carry the marker right before the quote (BTCUPUSDT),
+                # matching it anywhere also dropped coins like SUPERUSDT
+                if symbol[:-len(quote_asset)].endswith(LEVERAGED_TOKENS):
+                    continue
+                symbols.append(symbol)
+                volumes.append(quote_volume)
             
-            for ticker in usdt_pairs:
-                ticker['quoteVolume'] = float(ticker['quoteVolume'])
+            top_pairs = [symbols[i] for i in _top_n_indices(np.array(volumes, dtype=np.float64), top_n)]
+            self._top_cache = (time.monotonic(), top_n, quote_asset, top_pairs)
             
-            sorted_pairs = sorted(usdt_pairs, key=lambda x: x['quoteVolume'], reverse=True)
-            
-            top_pairs = [pair['symbol'] for pair in sorted_pairs[:top_n]]
-            
-            if self.logger:
-                self.logger.info(f"Top {top_n} pairs by volume: {', '.join(top_pairs)}")
+            self.logger.info("Top %s pairs by volume: %s", top_n, ', '.join(top_pairs))
             
             return top_pairs
             
         except BinanceAPIException as e:
-            if self.logger:
-                self.logger.error(f"Error fetching top volume pairs: {e}")
+            self.logger.error("Error fetching top volume pairs: %s", e)
             return []
     
     def get_symbol_price(self, symbol):
+        if self.stream is not None and self.stream.has_fresh_prices():
+            price = self.stream.latest_price.get(symbol)
+            if price is not None:
+                return price
+        
         try:
             ticker = self.client.get_symbol_ticker(symbol=symbol)
             return float(ticker['price'])
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting price for {symbol}: {e}")
+            self.logger.error("Error getting price for %s: %s", symbol, e)
             return None
     
+    def attach_stream(self, stream):
+        """Serve prices and klines from a StreamManager while its data is fresh"""
+        self.stream = stream
+    
+    def get_all_prices(self, max_age=2.0):
+        """
+        Latest price for every symbol in a single /ticker/price request
+        Snapshots younger than max_age seconds are reused
+        Returns {symbol: price}
+        """
+        if self.stream and self.stream.has_fresh_prices():
+            return self.stream.get_prices()
+        
+        if self._prices_cache and time.monotonic() - self._prices_cache[0] < max_age:
+            return self._prices_cache[1]
+        
+        try:
+            tickers = self.client.get_all_tickers()
+            prices = {ticker['symbol']: float(ticker['price']) for ticker in tickers}
+            self._prices_cache = (time.monotonic(), prices)
+            return prices
+        except Exception as e:
+            self.logger.error("Error getting all prices: %s", e)
+            return {}
+    
     def get_klines(self, symbol, interval='1h', limit=100):
         try:
             klines = self.client.get_klines(
@@ -57,32 +204,134 @@ class BinanceClientWrapper:
             )
             return klines
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting klines for {symbol}: {e}")
+            self.logger.error("Error getting klines for %s: %s", symbol, e)
             return []
     
+    def get_klines_incremental(self, symbol, interval='1h', limit=100):
+        """
+        Get klines from a local rolling window
+        First call downloads the full window, later calls only fetch the
+        last 2 candles and replace/append them at the tail
+        """
+        key = (symbol, interval)
+        cached = self._klines_cache.get(key)
+        
+        if cached is None or cached.maxlen != limit:
+            klines = self.get_klines(symbol, interval=interval, limit=limit)
+            if klines:
+                with self._klines_lock:
+                    self._klines_cache[key] = deque(klines, maxlen=limit)
+                    self._klines_refreshed[key] = time.monotonic()
+            return klines
+        
+        # WebSocket keeps the window current, no REST call needed
+        if self.stream and self.stream.has_fresh_klines(symbol, interval):
+            with self._klines_lock:
+                return list(cached)
+        
+        # Refreshed moments ago, the tail cannot have moved meaningfully
+        if time.monotonic() - self._klines_refreshed.get(key, 0) < self.klines_min_refresh_seconds:
+            with self._klines_lock:
+                return list(cached)
+        
+        latest = self.get_klines(symbol, interval=interval, limit=2)
+        
+        with self._klines_lock:
+            if not latest:
+                return list(cached)
+            
+            self._klines_refreshed[key] = time.monotonic()
+            
+            # Cached tail is older than the fetched candles - window has a gap, reload it
+            if latest[0][0] > cached[-1][0]:
+                del self._klines_cache[key]
+                cached = None
+            else:
+                # Drop candles that are being replaced (the still-open tail)
+                while cached and cached[-1][0] >= latest[0][0]:
+                    cached.pop()
+                cached.extend(latest)
+                return list(cached)
+        
+        return self.get_klines_incremental(symbol, interval=interval, limit=limit)
+    
+    def apply_kline_update(self, symbol, interval, row):
+        """
+        Merge a streamed kline into the rolling window
+        Returns False if the window has not been loaded yet, or was dropped
+        because the stream skipped candles (e.g. after a long reconnect)
+        """
+        key = (symbol, interval)
+        with self._klines_lock:
+            cached = self._klines_cache.get(key)
+            if not cached:
+                return False
+            
+            if row[0] == cached[-1][0]:
+                cached[-1] = row
+            elif row[0] == cached[-1][6] + 1:
+                cached.append(row)
+            elif row[0] > cached[-1][0]:
+                # Candles are missing in between - reload the full window over REST
+                del self._klines_cache[key]
+                self._klines_refreshed.pop(key, None)
+                return False
+            
+            return True
+    
+    def get_klines_batch(self, symbols, interval='1h', limit=100, max_workers=16):
+        """
+        Fetch klines for several symbols in parallel threads
+        Returns {symbol: klines}
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        
+        # Worker threads are kept across calls instead of being spawned every iteration;
+        # max_workers also bounds how many requests are in flight at once
+        executor = self._fetch_executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='klines')
+            self._fetch_executors[max_workers] = executor
+        
+        results = executor.map(lambda symbol: self.get_klines_incremental(symbol, interval=interval, limit=limit), symbols)
+        return dict(zip(symbols, results))
+    
+    def _get_asset_balance(self, asset):
+        """Asset balance from a short-lived cache, refreshed from REST after balance_ttl seconds"""
+        cached = self._balance_cache.get(asset)
+        if cached and time.monotonic() - cached[0] < self.balance_ttl:
+            return cached[1]
+        
+        balance = self.client.get_asset_balance(asset=asset)
+        self._balance_cache[asset] = (time.monotonic(), balance)
+        return balance
+    
+    def _invalidate_balances(self):
+        # Any order action can move balances
+        self._balance_cache.clear()
+    
     def get_account_balance(self, asset='USDT'):
         try:
-            balance = self.client.get_asset_balance(asset=asset)
+            balance = self._get_asset_balance(asset)
             return float(balance['free']) if balance else 0.0
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting balance for {asset}: {e}")
+            self.logger.error("Error getting balance for %s: %s", asset, e)
             return 0.0
     
     def create_limit_buy_order(self, symbol, quantity, price):
         try:
+            self._invalidate_balances()
             order = self.client.order_limit_buy(
                 symbol=symbol,
                 quantity=quantity,
                 price=price
             )
-            if self.logger:
-                self.logger.info(f"Limit buy order created for {symbol}: {quantity} @ {price}")
+            self.logger.info("Limit buy order created for %s: %s @ %s", symbol, quantity, price)
             return order
         except BinanceAPIException as e:
-            if self.logger:
-                self.logger.error(f"Error creating buy order for {symbol}: {e}")
+            self.logger.error("Error creating buy order for %s: %s", symbol, e)
             return None
     
     def get_order_status(self, symbol, order_id):
@@ -90,19 +339,17 @@ class BinanceClientWrapper:
             order = self.client.get_order(symbol=symbol, orderId=order_id)
             return order
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting order status for {symbol}: {e}")
+            self.logger.error("Error getting order status for %s: %s", symbol, e)
             return None
     
     def cancel_order(self, symbol, order_id):
         try:
+            self._invalidate_balances()
             result = self.client.cancel_order(symbol=symbol, orderId=order_id)
-            if self.logger:
-                self.logger.info(f"Order {order_id} cancelled for {symbol}")
+            self.logger.info("Order %s cancelled for %s", order_id, symbol)
             return result
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error cancelling order {order_id} for {symbol}: {e}")
+            self.logger.error("Error cancelling order %s for %s: %s", order_id, symbol, e)
             return None
     
     def get_open_orders(self, symbol):
@@ -110,90 +357,101 @@ class BinanceClientWrapper:
             orders = self.client.get_open_orders(symbol=symbol)
             return orders
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting open orders for {symbol}: {e}")
+            self.logger.error("Error getting open orders for %s: %s", symbol, e)
             return []
     
     def cancel_all_open_orders(self, symbol):
+        """Cancel every open order on symbol with a single DELETE /openOrders request"""
         try:
-            open_orders = self.get_open_orders(symbol)
-            if not open_orders:
-                return True
-            
-            if self.logger:
-                self.logger.info(f"Cancelling {len(open_orders)} open orders for {symbol}")
-            
-            for order in open_orders:
-                self.cancel_order(symbol, order['orderId'])
-            
-            time.sleep(0.5)
+            self._invalidate_balances()
+            cancelled = self.client.cancel_all_open_orders(symbol=symbol)
+            self.logger.info("Cancelled %s open orders for %s", len(cancelled), symbol)
             return True
+        except BinanceAPIException as e:
+            # -2011: no open orders to cancel
+            if e.code == -2011:
+                return True
+            self.logger.error("Error cancelling all orders for %s: %s", symbol, e)
+            return False
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error cancelling all orders for {symbol}: {e}")
+            self.logger.error("Error cancelling all orders for %s: %s", symbol, e)
             return False
     
     def create_limit_sell_order(self, symbol, quantity, price):
         try:
+            self._invalidate_balances()
             order = self.client.order_limit_sell(
                 symbol=symbol,
                 quantity=quantity,
                 price=price
             )
-            if self.logger:
-                self.logger.info(f"Limit sell order created for {symbol}: {quantity} @ {price}")
+            self.logger.info("Limit sell order created for %s: %s @ %s", symbol, quantity, price)
             return order
         except BinanceAPIException as e:
-            if self.logger:
-                self.logger.error(f"Error creating sell order for {symbol}: {e}")
+            self.logger.error("Error creating sell order for %s: %s", symbol, e)
+            return None
+    
+    def create_market_buy_order(self, symbol, quantity):
+        try:
+            self._invalidate_balances()
+            order = self.client.order_market_buy(
+                symbol=symbol,
+                quantity=quantity
+            )
+            self.logger.info("Market buy order created for %s: %s", symbol, quantity)
+            return order
+        except BinanceAPIException as e:
+            self.logger.error("Error creating market buy order for %s: %s", symbol, e)
             return None
     
     def create_market_sell_order(self, symbol, quantity):
         try:
+            self._invalidate_balances()
             order = self.client.order_market_sell(
                 symbol=symbol,
                 quantity=quantity
             )
-            if self.logger:
-                self.logger.info(f"Market sell order created for {symbol}: {quantity}")
+            self.logger.info("Market sell order created for %s: %s", symbol, quantity)
             return order
         except BinanceAPIException as e:
-            if self.logger:
-                self.logger.error(f"Error creating market sell order for {symbol}: {e}")
+            self.logger.error("Error creating market sell order for %s: %s", symbol, e)
             return None
     
     def get_symbol_info(self, symbol):
+        # Exchange filters are static while the bot runs - only successful lookups are cached
+        info = self._symbol_info_cache.get(symbol)
+        if info is not None:
+            return info
+        
         try:
             info = self.client.get_symbol_info(symbol)
+            if info:
+                self._symbol_info_cache[symbol] = info
             return info
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting symbol info for {symbol}: {e}")
+            self.logger.error("Error getting symbol info for %s: %s", symbol, e)
             return None
     
     def get_asset_balance_quantity(self, asset):
         try:
-            balance = self.client.get_asset_balance(asset=asset)
+            balance = self._get_asset_balance(asset)
             return float(balance['free']) if balance else 0.0
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting balance quantity for {asset}: {e}")
+            self.logger.error("Error getting balance quantity for %s: %s", asset, e)
             return 0.0
     
     def get_asset_total_balance(self, asset):
         try:
-            balance = self.client.get_asset_balance(asset=asset)
+            balance = self._get_asset_balance(asset)
             if balance:
                 free = float(balance.get('free', 0))
                 locked = float(balance.get('locked', 0))
                 total = free + locked
-                if self.logger:
-                    self.logger.debug(f"{asset} balance - Free: {free}, Locked: {locked}, Total: {total}")
+                self.logger.debug("%s balance - Free: %s, Locked: %s, Total: %s", asset, free, locked, total)
                 return free, locked, total
             return 0.0, 0.0, 0.0
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting total balance for {asset}: {e}")
+            self.logger.error("Error getting total balance for %s: %s", asset, e)
             return 0.0, 0.0, 0.0
     
     def get_my_trades(self, symbol, limit=10):
@@ -201,6 +459,5 @@ class BinanceClientWrapper:
             trades = self.client.get_my_trades(symbol=symbol, limit=limit)
             return trades
         except Exception as e:
-            if self.logger:
-                self.logger.error(f"Error getting trades for {symbol}: {e}")
+            self.logger.error("Error getting trades for %s: %s", symbol, e)
             return []
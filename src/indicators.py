@@ -1,6 +1,90 @@
 import pandas as pd
-import pandas_ta as ta
 import numpy as np
+from bisect import bisect_left
+from collections import OrderedDict, deque
+
+# Heiken Ashi open decay 0.5^k for k = 1..64 - past that the weights vanish in float64
+_HA_WEIGHTS = 0.5 ** np.arange(1, 65)
+
+def klines_to_ohlcv(klines):
+    """
+    Convert raw Binance klines (lists of strings) into a contiguous
+    float64 matrix of shape (n, 5) with columns open/high/low/close/volume
+    """
+    if isinstance(klines, np.ndarray):
+        # Already a matrix - only cast if it is not float64 (no copy otherwise)
+        return np.asarray(klines, dtype=np.float64)
+    
+    return np.array([kline[1:6] for kline in klines], dtype=np.float64).reshape(-1, 5)
+
+def _seeded_ewm(values, alpha, length):
+    """
+    Single-pole IIR filter y[i] = a*x[i] + (1-a)*y[i-1], seeded with the SMA
+    of the first `length` values at index length-1 (NaN before that)
+    The recurrence is unrolled into one convolution with the full decay
+    kernel, so no Python loop runs over the candles
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n < length:
+        return out
+    
+    beta = 1.0 - alpha
+    
+    seed = values[:length].mean()
+    out[length - 1] = seed
+    
+    m = n - length
+    if m > 0:
+        out[length:] = np.convolve(values[length:], alpha * beta ** np.arange(m))[:m] + seed * beta ** np.arange(1, m + 1)
+    
+    return out
+
+def _ema(values, length):
+    """EMA with an SMA seed (same definition as ta.ema)"""
+    return _seeded_ewm(values, 2.0 / (length + 1), length)
+
+def _window_mean(values, window):
+    """Mean of the last `window` values, skipping NaN (NaN if none are set)"""
+    tail = values[-window:]
+    tail = tail[~np.isnan(tail)]
+    return tail.mean() if len(tail) else np.nan
+
+def _rsi_averages(close, length):
+    """
+    Wilder average gain and average loss of the close-to-close changes,
+    smoothed with alpha = 1/length and seeded with the SMA (NaN until defined)
+    """
+    avg_gain = np.full(len(close), np.nan)
+    avg_loss = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return avg_gain, avg_loss
+    
+    change = np.diff(close)
+    avg_gain[1:] = _seeded_ewm(np.maximum(change, 0.0), 1.0 / length, length)
+    avg_loss[1:] = _seeded_ewm(np.maximum(-change, 0.0), 1.0 / length, length)
+    return avg_gain, avg_loss
+
+def _rsi_value(avg_gain, avg_loss):
+    """RSI from Wilder averages (NaN on a flat market, like ta.rsi)"""
+    total = avg_gain + avg_loss
+    return 100.0 * avg_gain / total if total else np.nan
+
+def _atr(high, low, close, length):
+    """
+    Wilder ATR: true range smoothed with alpha = 1/length, seeded with the SMA
+    of the first `length` true ranges (the TA-Lib definition)
+    """
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    
+    # True range needs the previous close, so it starts at the second candle
+    prev_close = close[:-1]
+    true_range = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    
+    out[1:] = _seeded_ewm(true_range, 1.0 / length, length)
+    return out
 
 class TechnicalIndicators:
     def __init__(self, config, logger=None):
@@ -27,48 +111,76 @@ class TechnicalIndicators:
         # Volatility filter
         self.volatility_enabled = config.get('volatility.enabled', True)
         self.atr_multiplier = config.get('volatility.atr_multiplier', 1.5)
-    
-    def _prepare_dataframe(self, klines):
-        """Convert klines to DataFrame with proper types"""
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
         
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        # Minimum candles for every indicator to be defined
+        self.min_candles = max(self.ema_slow, self.rsi_period, self.atr_period, self.atr_lookback) + 10
+        
+        # Results cache keyed by (symbol, candle count, last candle), LRU order
+        self._results_cache = OrderedDict()
+        self._results_cache_size = 256
+        
+        # Reuse a symbol's last result while its candle is still open and the
+        # close moved less than this fraction of ATR (0 disables)
+        self.reuse_atr_fraction = config.get('indicators.reuse_atr_fraction', 0.1)
+        self._last_results = {}
+        
+        # Parsed OHLCV rows per symbol: (open times, matrix), reused across calls
+        self._ohlcv_cache = {}
         
-        return df
+        # Indicator state per symbol as of its last closed candle, so each call
+        # only steps the filters through new candles instead of the whole history
+        # Values therefore cover everything seen since the symbol was first
+        # computed, not only the fetched window (EMA/RSI/ATR seeds differ)
+        self._state = {}
+        
+        # Smoothing factors for the state steps
+        self._ema_fast_alpha = 2.0 / (self.ema_fast + 1)
+        self._ema_slow_alpha = 2.0 / (self.ema_slow + 1)
+        self._rsi_alpha = 1.0 / self.rsi_period
+        self._atr_alpha = 1.0 / self.atr_period
     
     def calculate_heiken_ashi(self, df):
         """
         Calculate Heiken Ashi candles
         Returns DataFrame with ha_open, ha_high, ha_low, ha_close
         """
-        ha = df.copy()
-        
+        ha_open, ha_close, ha_high, ha_low = self._heiken_ashi_arrays(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+        )
+        
+        return pd.DataFrame({
+            'ha_open': ha_open,
+            'ha_close': ha_close,
+            'ha_high': ha_high,
+            'ha_low': ha_low,
+        }, index=df.index)
+    
+    def _heiken_ashi_arrays(self, open_, high, low, close):
+        """Heiken Ashi open/close/high/low arrays from OHLC arrays"""
         # HA Close = (O + H + L + C) / 4
-        ha['ha_close'] = (df['open'] + df['high'] + df['low'] + df['close']) / 4
+        ha_close = (open_ + high + low + close) / 4
         
         # HA Open - initialize
-        ha['ha_open'] = 0.0
-        ha.loc[ha.index[0], 'ha_open'] = (df.loc[df.index[0], 'open'] + df.loc[df.index[0], 'close']) / 2
-        
-        # HA Open - calculate for remaining candles
-        for i in range(1, len(ha)):
-            ha.loc[ha.index[i], 'ha_open'] = (ha.loc[ha.index[i-1], 'ha_open'] + ha.loc[ha.index[i-1], 'ha_close']) / 2
+        n = len(ha_close)
+        ha_open_first = (open_[0] + close[0]) / 2
+        
+        # HA Open - ha_open[i] = (ha_open[i-1] + ha_close[i-1]) / 2, unrolled to
+        # ha_open[i] = 0.5^i * ha_open[0] + sum(0.5^(i-j) * ha_close[j] for j < i)
+        # The seed term also vanishes after 64 steps, so both reuse the same kernel
+        ha_open = np.empty(n)
+        ha_open[0] = ha_open_first
+        if n > 1:
+            k = min(n - 1, len(_HA_WEIGHTS))
+            ha_open[1:] = np.convolve(ha_close, _HA_WEIGHTS[:k])[:n - 1]
+            ha_open[1:k + 1] += ha_open_first * _HA_WEIGHTS[:k]
         
         # HA High = max(H, HA_Open, HA_Close)
-        ha['ha_high'] = ha[['high', 'ha_open', 'ha_close']].max(axis=1)
+        ha_high = np.maximum(np.maximum(high, ha_open), ha_close)
         
         # HA Low = min(L, HA_Open, HA_Close)
-        ha['ha_low'] = ha[['low', 'ha_open', 'ha_close']].min(axis=1)
+        ha_low = np.minimum(np.minimum(low, ha_open), ha_close)
         
-        return ha
+        return ha_open, ha_close, ha_high, ha_low
     
     def check_heiken_ashi_signal(self, ha_df, direction='buy'):
         """
@@ -85,13 +197,16 @@ class TechnicalIndicators:
         if len(ha_df) < 1:
             return False
         
-        latest = ha_df.iloc[-1]
-        
-        ha_open = latest['ha_open']
-        ha_close = latest['ha_close']
-        ha_high = latest['ha_high']
-        ha_low = latest['ha_low']
-        
+        # Read the four scalars directly instead of building a row Series
+        return self._heiken_ashi_signal(
+            ha_df['ha_open'].to_numpy()[-1],
+            ha_df['ha_close'].to_numpy()[-1],
+            ha_df['ha_high'].to_numpy()[-1],
+            ha_df['ha_low'].to_numpy()[-1],
+            direction
+        )
+    
+    def _heiken_ashi_signal(self, ha_open, ha_close, ha_high, ha_low, direction):
         # Calculate body and range
         body = abs(ha_close - ha_open)
         total_range = ha_high - ha_low
@@ -113,60 +228,242 @@ class TechnicalIndicators:
         
         return False
     
-    def calculate_indicators(self, klines):
+    def calculate_indicators(self, klines, symbol=None, reuse=False):
         """
         Calculate all technical indicators
         Returns dict with indicator values and signals
+        
+        When symbol is given, results are reused for identical raw klines
+        (same length and same last candle, including its live close)
+        reuse=True also accepts the last result while the live close moved less
+        than reuse_atr_fraction × ATR - for entry scanning only, not held positions
         """
-        # Minimum data requirement
-        min_required = max(self.ema_slow, self.rsi_period, self.atr_period, self.atr_lookback) + 10
+        if symbol is None or isinstance(klines, np.ndarray) or not klines:
+            return self._compute_indicators(klines)
         
-        if not klines or len(klines) < min_required:
-            if self.logger:
-                self.logger.warning(f"Insufficient data: {len(klines) if klines else 0} candles, need {min_required}")
-            return None
+        key = (symbol, len(klines), tuple(klines[-1][:6]))
         
-        df = self._prepare_dataframe(klines)
+        hit, result = self._get_cached(symbol, key, reuse)
+        if hit:
+            return result
         
-        # Calculate EMA
-        df['ema_fast'] = ta.ema(df['close'], length=self.ema_fast)
-        df['ema_slow'] = ta.ema(df['close'], length=self.ema_slow)
+        result = self._compute_streaming(symbol, self._parse_klines(symbol, klines))
+        self._store_cached(symbol, key, result)
         
-        # Calculate RSI
-        df['rsi'] = ta.rsi(df['close'], length=self.rsi_period)
+        return result
+    
+    def _parse_klines(self, symbol, klines):
+        """
+        OHLCV matrix for a symbol's raw klines, reusing rows parsed on the previous call
+        Only candles that are new or were still forming last time are converted
+        """
+        cached = self._ohlcv_cache.get(symbol)
         
-        # Calculate ATR
-        df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=self.atr_period)
+        if cached:
+            times, matrix = cached
+            offset = bisect_left(times, klines[0][0])
+            
+            # Rows before the previously forming last candle are final and can be kept
+            reuse = len(times) - 1 - offset
+            if 0 < reuse < len(klines) and times[offset] == klines[0][0] and times[offset + reuse - 1] == klines[reuse - 1][0]:
+                fresh = klines[reuse:]
+                matrix = np.vstack((matrix[offset:offset + reuse], klines_to_ohlcv(fresh)))
+                times = times[offset:offset + reuse] + [kline[0] for kline in fresh]
+                self._ohlcv_cache[symbol] = (times, matrix)
+                return matrix
+        
+        matrix = klines_to_ohlcv(klines)
+        self._ohlcv_cache[symbol] = ([kline[0] for kline in klines], matrix)
+        return matrix
+    
+    def _get_cached(self, symbol, key, reuse):
+        """Look up a cached result, returns (hit, result)"""
+        if key in self._results_cache:
+            self._results_cache.move_to_end(key)
+            return True, self._results_cache[key]
+        
+        # Same open candle and the close barely moved - indicators are effectively unchanged
+        last = self._last_results.get(symbol) if reuse else None
+        if last and self.reuse_atr_fraction > 0:
+            open_time, close, result = last
+            candle = key[2]
+            if candle[0] == open_time and abs(float(candle[4]) - close) < result['atr'] * self.reuse_atr_fraction:
+                return True, result
+        
+        return False, None
+    
+    def _store_cached(self, symbol, key, result):
+        self._results_cache[key] = result
+        if len(self._results_cache) > self._results_cache_size:
+            self._results_cache.popitem(last=False)
+        
+        if result:
+            candle = key[2]
+            self._last_results[symbol] = (candle[0], float(candle[4]), result)
+    
+    def calculate_indicators_batch(self, klines_by_symbol, reuse=False):
+        """
+        Calculate indicators for several symbols at once
+        Returns dict of symbol -> indicator dict (None when data is insufficient)
         
-        # Calculate Heiken Ashi
-        ha_df = self.calculate_heiken_ashi(df)
+        Cached symbols are served from the results cache; for the rest only
+        the candles not parsed on a previous call are converted
+        reuse: same as in calculate_indicators
+        """
+        results = {}
         
-        # Get latest values
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
+        for symbol, klines in klines_by_symbol.items():
+            if not klines:
+                continue
+            
+            key = (symbol, len(klines), tuple(klines[-1][:6]))
+            
+            hit, result = self._get_cached(symbol, key, reuse)
+            if not hit:
+                result = self._compute_streaming(symbol, self._parse_klines(symbol, klines))
+                self._store_cached(symbol, key, result)
+            
+            results[symbol] = result
+        
+        return results
+    
+    def _compute_indicators(self, klines):
+        if klines is None or len(klines) < self.min_candles:
+            if self.logger:
+                self.logger.warning("Insufficient data: %d candles, need %d", len(klines) if klines is not None else 0, self.min_candles)
+            return None
+        
+        ohlcv = klines_to_ohlcv(klines)
+        series = self._indicator_series(ohlcv)
+        
+        latest = {name: values[-1] for name, values in series.items()}
+        previous_diff = series['ema_fast'][-2] - series['ema_slow'][-2]
+        
+        return self._build_result(ohlcv[-1], latest, previous_diff, series['atr'][-self.atr_lookback:])
+    
+    def _indicator_series(self, ohlcv):
+        """Full indicator series over an OHLCV matrix, as a dict of arrays"""
+        open_, high, low, close = ohlcv[:, 0], ohlcv[:, 1], ohlcv[:, 2], ohlcv[:, 3]
+        
+        avg_gain, avg_loss = _rsi_averages(close, self.rsi_period)
+        ha_open, ha_close, ha_high, ha_low = self._heiken_ashi_arrays(open_, high, low, close)
+        
+        return {
+            'ema_fast': _ema(close, self.ema_fast),
+            'ema_slow': _ema(close, self.ema_slow),
+            'avg_gain': avg_gain,
+            'avg_loss': avg_loss,
+            'atr': _atr(high, low, close, self.atr_period),
+            'ha_open': ha_open,
+            'ha_close': ha_close,
+            'ha_high': ha_high,
+            'ha_low': ha_low,
+        }
+    
+    def _compute_streaming(self, symbol, ohlcv):
+        """
+        Indicators for a symbol's parsed klines, stepping the stored state
+        through the candles closed since the last call (O(1) per candle)
+        Falls back to the full computation on a cold start or a gap
+        """
+        if len(ohlcv) < self.min_candles:
+            return self._compute_indicators(ohlcv)
+        
+        times = self._ohlcv_cache[symbol][0]
+        state = self._state.get(symbol)
+        
+        if state is not None:
+            i = bisect_left(times, state['time'])
+            if i < len(times) - 1 and times[i] == state['time']:
+                # Every candle before the last one is closed
+                for row, open_time in zip(ohlcv[i + 1:-1].tolist(), times[i + 1:-1]):
+                    state = self._advance_state(state, row, open_time)
+                self._state[symbol] = state
+            else:
+                state = None
+        
+        if state is None:
+            state = self._seed_state(symbol, ohlcv, times)
+        
+        candle = ohlcv[-1].tolist()
+        latest = self._step_state(state, candle)
+        atr_tail = np.append(np.fromiter(state['atr_window'], dtype=np.float64), latest['atr'])
+        
+        return self._build_result(candle, latest, state['ema_fast'] - state['ema_slow'], atr_tail)
+    
+    def _seed_state(self, symbol, ohlcv, times):
+        """
+        Full computation, keeping the values at the last closed candle as state
+        State holds Python floats - the per-candle steps are scalar arithmetic,
+        which is several times slower on NumPy scalars
+        """
+        series = self._indicator_series(ohlcv)
         
+        state = {name: float(values[-2]) for name, values in series.items()}
+        state['time'] = times[-2]
+        state['close'] = float(ohlcv[-2, 3])
+        state['atr_window'] = deque(series['atr'][-self.atr_lookback:-1].tolist(), maxlen=self.atr_lookback - 1)
+        
+        self._state[symbol] = state
+        return state
+    
+    def _advance_state(self, state, row, open_time):
+        """State after one more closed candle"""
+        latest = self._step_state(state, row)
+        
+        state['atr_window'].append(latest['atr'])
+        latest['time'] = open_time
+        latest['close'] = row[3]
+        latest['atr_window'] = state['atr_window']
+        return latest
+    
+    def _step_state(self, state, row):
+        """Indicator values for the candle following the state's candle"""
+        open_, high, low, close = row[0], row[1], row[2], row[3]
+        prev_close = state['close']
+        
+        change = close - prev_close
+        true_range = max(high, prev_close) - min(low, prev_close)
+        
+        ha_open = (state['ha_open'] + state['ha_close']) / 2
+        ha_close = (open_ + high + low + close) / 4
+        
+        return {
+            'ema_fast': state['ema_fast'] + self._ema_fast_alpha * (close - state['ema_fast']),
+            'ema_slow': state['ema_slow'] + self._ema_slow_alpha * (close - state['ema_slow']),
+            'avg_gain': state['avg_gain'] + self._rsi_alpha * (max(change, 0.0) - state['avg_gain']),
+            'avg_loss': state['avg_loss'] + self._rsi_alpha * (max(-change, 0.0) - state['avg_loss']),
+            'atr': state['atr'] + self._atr_alpha * (true_range - state['atr']),
+            'ha_open': ha_open,
+            'ha_close': ha_close,
+            'ha_high': max(high, ha_open, ha_close),
+            'ha_low': min(low, ha_open, ha_close),
+        }
+    
+    def _build_result(self, candle, latest, previous_diff, atr_tail):
+        """Result dict from the latest indicator values"""
         result = {
             # Raw values
-            'close': latest['close'],
-            'open': latest['open'],
-            'high': latest['high'],
-            'low': latest['low'],
+            'close': candle[3],
+            'open': candle[0],
+            'high': candle[1],
+            'low': candle[2],
             
             # EMA
             'ema_fast': latest['ema_fast'],
             'ema_slow': latest['ema_slow'],
             
             # RSI
-            'rsi': latest['rsi'],
+            'rsi': _rsi_value(latest['avg_gain'], latest['avg_loss']),
             
             # ATR
             'atr': latest['atr'],
             
             # Heiken Ashi
-            'ha_open': ha_df['ha_open'].iloc[-1],
-            'ha_close': ha_df['ha_close'].iloc[-1],
-            'ha_high': ha_df['ha_high'].iloc[-1],
-            'ha_low': ha_df['ha_low'].iloc[-1],
+            'ha_open': latest['ha_open'],
+            'ha_close': latest['ha_close'],
+            'ha_high': latest['ha_high'],
+            'ha_low': latest['ha_low'],
         }
         
         # Check for NaN values
@@ -179,34 +476,35 @@ class TechnicalIndicators:
         result['ema_crossover_up'] = False
         result['ema_crossover_down'] = False
         
-        if not pd.isna(previous['ema_fast']) and not pd.isna(previous['ema_slow']):
+        # Sign of fast - slow over the last two candles
+        latest_diff = result['ema_fast'] - result['ema_slow']
+        
+        if not pd.isna(previous_diff):
             # Bullish crossover: EMA fast crosses above EMA slow
-            if previous['ema_fast'] <= previous['ema_slow'] and latest['ema_fast'] > latest['ema_slow']:
-                result['ema_crossover_up'] = True
+            result['ema_crossover_up'] = previous_diff <= 0 and latest_diff > 0
             
             # Bearish crossover: EMA fast crosses below EMA slow
-            if previous['ema_fast'] >= previous['ema_slow'] and latest['ema_fast'] < latest['ema_slow']:
-                result['ema_crossover_down'] = True
+            result['ema_crossover_down'] = previous_diff >= 0 and latest_diff < 0
         
         # EMA position
-        result['ema_fast_above_slow'] = latest['ema_fast'] > latest['ema_slow']
+        result['ema_fast_above_slow'] = latest_diff > 0
         
         # RSI signals
-        result['rsi_oversold'] = latest['rsi'] < self.rsi_oversold
-        result['rsi_overbought'] = latest['rsi'] > self.rsi_overbought
+        result['rsi_oversold'] = result['rsi'] < self.rsi_oversold
+        result['rsi_overbought'] = result['rsi'] > self.rsi_overbought
         
         # Heiken Ashi confirmation
-        result['ha_bullish'] = self.check_heiken_ashi_signal(ha_df, direction='buy')
-        result['ha_bearish'] = self.check_heiken_ashi_signal(ha_df, direction='sell')
+        result['ha_bullish'] = self._heiken_ashi_signal(result['ha_open'], result['ha_close'], result['ha_high'], result['ha_low'], 'buy')
+        result['ha_bearish'] = self._heiken_ashi_signal(result['ha_open'], result['ha_close'], result['ha_high'], result['ha_low'], 'sell')
+        
+        # Average ATR over the lookback, computed once for the filter and the result
+        atr_average = _window_mean(atr_tail, self.atr_lookback) if len(atr_tail) >= self.atr_lookback else None
         
         # Volatility filter
-        result['passes_volatility_filter'] = self.check_volatility_filter(df)
+        result['passes_volatility_filter'] = self._passes_volatility_filter(result['atr'], atr_average)
         
         # Average ATR for reference
-        if len(df) >= self.atr_lookback:
-            result['atr_average'] = df['atr'].iloc[-self.atr_lookback:].mean()
-        else:
-            result['atr_average'] = result['atr']
+        result['atr_average'] = result['atr'] if atr_average is None else atr_average
         
         return result
     
@@ -218,30 +516,21 @@ class TechnicalIndicators:
         if not self.volatility_enabled:
             return True
         
-        if len(df) < self.atr_lookback:
+        atr = df['atr'].to_numpy()
+        if len(atr) < self.atr_lookback:
             return False
         
-        current_atr = df['atr'].iloc[-1]
-        avg_atr = df['atr'].iloc[-self.atr_lookback:].mean()
+        return self._passes_volatility_filter(atr[-1], _window_mean(atr, self.atr_lookback))
+    
+    def _passes_volatility_filter(self, current_atr, avg_atr):
+        """ATR > average ATR × multiplier, avg_atr is None when the history is too short"""
+        if not self.volatility_enabled:
+            return True
+        
+        if avg_atr is None:
+            return False
         
         if pd.isna(current_atr) or pd.isna(avg_atr) or avg_atr == 0:
             return False
         
         return current_atr > (avg_atr * self.atr_multiplier)
-    
-    def get_atr_for_trailing_stop(self, klines):
-        """
-        Get current ATR value for trailing stop calculation
-        """
-        if not klines or len(klines) < self.atr_period + 5:
-            return None
-        
-        df = self._prepare_dataframe(klines)
-        df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=self.atr_period)
-        
-        current_atr = df['atr'].iloc[-1]
-        
-        if pd.isna(current_atr):
-            return None
-        
-        return current_atr
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 
 def setup_logger(name='trading_bot'):
@@ -28,7 +31,12 @@ def setup_logger(name='trading_bot'):
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Records are queued by the caller and written by a background listener thread
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return logger
@@ -26,7 +26,7 @@ class OrderManager:
                 
                 if attempt < max_retries - 1:
                     if self.logger:
-                        self.logger.debug(f"No trades found for order {order_id}, retrying... (attempt {attempt + 1}/{max_retries})")
+                        self.logger.debug("No trades found for order %s, retrying... (attempt %d/%d)", order_id, attempt + 1, max_retries)
                     time.sleep(1 * (attempt + 1))
                 
             except Exception as e:
@@ -45,8 +45,13 @@ class OrderManager:
         if not trades:
             return fallback_price, 0
         
-        total_cost = sum(float(t['price']) * float(t['qty']) for t in trades)
-        total_qty = sum(float(t['qty']) for t in trades)
+        # Single pass over the fills, each field converted once
+        total_cost = 0.0
+        total_qty = 0.0
+        for t in trades:
+            qty = float(t['qty'])
+            total_cost += float(t['price']) * qty
+            total_qty += qty
         
         if total_qty > 0:
             avg_price = total_cost / total_qty
@@ -110,13 +115,15 @@ class OrderManager:
         
         return quantity
     
-    def place_market_buy(self, symbol, amount_usd):
+    def place_market_buy(self, symbol, amount_usd, reference_price=None):
         """
         Place market buy order
+        reference_price: price the caller already holds, used for sizing
+        instead of a fresh request
         Returns: {symbol, price, quantity, order_id} or None
         """
         try:
-            current_price = self.client.get_symbol_price(symbol)
+            current_price = reference_price or self.client.get_symbol_price(symbol)
             if not current_price:
                 return None
             
@@ -140,10 +147,7 @@ class OrderManager:
             fills = order.get('fills', [])
             
             if fills:
-                total_cost = sum(float(fill['price']) * float(fill['qty']) for fill in fills)
-                total_qty = sum(float(fill['qty']) for fill in fills)
-                avg_price = total_cost / total_qty if total_qty > 0 else current_price
-                executed_qty = total_qty
+                avg_price, executed_qty = self._calculate_avg_price_from_trades(fills, current_price)
             else:
                 # Fallback
                 executed_qty = float(order.get('executedQty', quantity))
@@ -218,7 +222,7 @@ class OrderManager:
                     fills = order_status.get('fills', [])
                     
                     if fills:
-                        avg_price = sum(float(fill['price']) * float(fill['qty']) for fill in fills) / sum(float(fill['qty']) for fill in fills)
+                        avg_price = self._calculate_avg_price_from_trades(fills, float(order_status.get('price', 0)))[0]
                     else:
                         avg_price = float(order_status.get('price', 0))
                     
@@ -247,7 +251,7 @@ class OrderManager:
                     if executed_qty > 0:
                         fills = order_status.get('fills', [])
                         if fills:
-                            avg_price = sum(float(fill['price']) * float(fill['qty']) for fill in fills) / sum(float(fill['qty']) for fill in fills)
+                            avg_price = self._calculate_avg_price_from_trades(fills, float(order_status.get('price', 0)))[0]
                         else:
                             avg_price = float(order_status.get('price', 0))
                         
@@ -292,7 +296,7 @@ class OrderManager:
             if executed_qty > 0:
                 fills = final_status.get('fills', [])
                 if fills:
-                    avg_price = sum(float(fill['price']) * float(fill['qty']) for fill in fills) / sum(float(fill['qty']) for fill in fills)
+                    avg_price = self._calculate_avg_price_from_trades(fills, float(final_status.get('price', 0)))[0]
                 else:
                     avg_price = float(final_status.get('price', 0))
                 
@@ -388,7 +392,7 @@ class OrderManager:
             if order:
                 fills = order.get('fills', [])
                 if fills:
-                    avg_price = sum(float(fill['price']) * float(fill['qty']) for fill in fills) / sum(float(fill['qty']) for fill in fills)
+                    avg_price = self._calculate_avg_price_from_trades(fills, None)[0]
                     if self.logger:
                         self.logger.info(f"Position closed successfully for {symbol} @ {avg_price}")
                     return avg_price
@@ -438,7 +442,7 @@ class OrderManager:
                         if retry_order:
                             fills = retry_order.get('fills', [])
                             if fills:
-                                avg_price = sum(float(fill['price']) * float(fill['qty']) for fill in fills) / sum(float(fill['qty']) for fill in fills)
+                                avg_price = self._calculate_avg_price_from_trades(fills, None)[0]
                                 return avg_price
                             return self.client.get_symbol_price(symbol)
                     else:
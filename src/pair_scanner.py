@@ -11,6 +11,7 @@ class PairScanner:
         self.pairs = config.get('scanner.pairs', [])
         self.scan_interval = config.get('scanner.scan_interval_seconds', 60)
         self.max_pairs_to_trade = config.get('scanner.max_pairs_to_trade', 5)
+        self.max_workers = config.get('binance.max_workers', 16)
         
         # Timeframe
         self.timeframe = config.get('timeframe', '15m')
@@ -28,7 +29,7 @@ class PairScanner:
         current_time = time.time()
         if not force_scan and (current_time - self.last_scan_time) < self.scan_interval:
             if self.logger:
-                self.logger.debug(f"Using cached scan results ({len(self.cached_results)} pairs)")
+                self.logger.debug("Using cached scan results (%d pairs)", len(self.cached_results))
             return self.cached_results
         
         if self.logger:
@@ -36,16 +37,15 @@ class PairScanner:
         
         scored_pairs = []
         
+        # Fetch klines for all pairs concurrently
+        klines_by_symbol = self.client.get_klines_batch(self.pairs, interval=self.timeframe, limit=100, max_workers=self.max_workers)
+        
+        # Calculate indicators for every pair in one batch
+        indicators_by_symbol = self.indicators.calculate_indicators_batch(klines_by_symbol, reuse=True)
+        
         for symbol in self.pairs:
             try:
-                # Get klines
-                klines = self.client.get_klines(symbol, interval=self.timeframe, limit=100)
-                
-                if not klines:
-                    continue
-                
-                # Calculate indicators
-                indicators = self.indicators.calculate_indicators(klines)
+                indicators = indicators_by_symbol.get(symbol)
                 
                 if not indicators:
                     continue
@@ -60,9 +60,6 @@ class PairScanner:
                         'indicators': indicators
                     })
                 
-                # Rate limiting
-                time.sleep(0.1)
-                
             except Exception as e:
                 if self.logger:
                     self.logger.error(f"Error scanning {symbol}: {e}")
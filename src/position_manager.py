@@ -8,8 +8,14 @@ class PositionManager:
         self.logger = logger
         self.positions = {}
         self.positions_file = 'positions.json'
+        self.positions_journal_file = 'positions.journal'
         self.daily_pnl_file = 'daily_pnl.json'
         
+        # Position changes are appended to the journal, and folded into
+        # positions.json once this many entries have accumulated
+        self.journal_compact_every = 50
+        self.journal_entries = 0
+        
         # Risk management settings
         self.max_positions = config.get('risk_management.max_positions', 5)
         self.position_size_percent = config.get('risk_management.position_size_percent', 25)
@@ -17,6 +23,10 @@ class PositionManager:
         self.daily_profit_protection_percent = config.get('risk_management.daily_profit_protection_percent', 3.0)
         self.protection_mode_behavior = config.get('risk_management.protection_mode_behavior', 'stop_new_entries')
         
+        # Exit settings
+        self.initial_stop_percent = config.get('exit.trailing_stop.initial_percent', 2.5)
+        self.trailing_atr_multiplier = config.get('exit.trailing_stop.atr_multiplier', 2.0)
+        
         # Daily tracking settings
         self.reset_hour_utc = config.get('daily_tracking.reset_hour_utc', 0)
         self.track_realized_only = config.get('daily_tracking.track_realized_only', True)
@@ -38,6 +48,77 @@ class PositionManager:
                 self.positions = {}
         else:
             self.positions = {}
+        
+        self._replay_journal()
+    
+    def _replay_journal(self):
+        """Apply journal entries written after the last positions.json snapshot"""
+        if not os.path.exists(self.positions_journal_file):
+            return
+        
+        replayed = 0
+        with open(self.positions_journal_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash - everything before it is intact
+                    if self.logger:
+                        self.logger.warning("Ignoring incomplete positions journal entry")
+                    break
+                
+                if entry['op'] == 'set':
+                    self.positions[entry['symbol']] = entry['position']
+                elif entry['op'] == 'remove':
+                    self.positions.pop(entry['symbol'], None)
+                replayed += 1
+        
+        self.journal_entries = replayed
+        
+        if replayed and self.logger:
+            self.logger.info(f"Replayed {replayed} journal entries, {len(self.positions)} positions open")
+        
+        # Fold the journal into a fresh snapshot so new entries never follow a torn
+        # line and positions.json is again the full record
+        try:
+            self.save_positions()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"CRITICAL: Could not compact positions journal at startup: {e}")
+    
+    def _journal_position(self, symbol):
+        """Append the current state of one position to the journal (fsynced)"""
+        if symbol in self.positions:
+            entry = {'op': 'set', 'symbol': symbol, 'position': self.positions[symbol]}
+        else:
+            entry = {'op': 'remove', 'symbol': symbol}
+        
+        try:
+            with open(self.positions_journal_file, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"CRITICAL: Error writing positions journal: {e}")
+            raise Exception(f"Failed to save positions: {e}")
+        
+        self.journal_entries += 1
+        
+        if self.journal_entries >= self.journal_compact_every:
+            try:
+                self.save_positions()
+            except Exception:
+                # Change is already durable in the journal, compaction retries on the next write
+                pass
+    
+    def close(self):
+        """
+        Fold the journal into positions.json on shutdown, so the snapshot is
+        the full record and hand edits to it are not undone by a replay
+        """
+        if self.journal_entries:
+            self.save_positions()
     
     def save_positions(self):
         """Save positions with atomic write and verification"""
@@ -72,8 +153,13 @@ class PositionManager:
                 # Atomic replace
                 os.replace(temp_path, self.positions_file)
                 
+                # Snapshot now contains everything in the journal
+                with open(self.positions_journal_file, 'w'):
+                    pass
+                self.journal_entries = 0
+                
                 if self.logger:
-                    self.logger.debug(f"Positions saved and verified: {len(self.positions)} positions")
+                    self.logger.debug("Positions saved and verified: %d positions", len(self.positions))
                 return True
                 
             except Exception as e:
@@ -207,7 +293,7 @@ class PositionManager:
     def add_position(self, symbol, entry_price, quantity, side='BUY', order_id=None, initial_stop_percent=None):
         """Add new position"""
         if initial_stop_percent is None:
-            initial_stop_percent = self.config.get('exit.trailing_stop.initial_percent', 2.5)
+            initial_stop_percent = self.initial_stop_percent
         
         # Calculate initial stop
         if side == 'BUY':
@@ -232,7 +318,7 @@ class PositionManager:
         self.positions[symbol] = position_data
         
         try:
-            self.save_positions()
+            self._journal_position(symbol)
             if self.logger:
                 self.logger.info(f"✓ Position saved: {symbol} {side} @ {entry_price}, qty: {quantity}, stop: {stop_loss:.8f}")
         except Exception as e:
@@ -252,9 +338,9 @@ class PositionManager:
         side = position.get('side', 'BUY')
         
         old_stop = position.get('trailing_stop')
+        changed = False
         
-        # Get ATR multiplier from config
-        atr_multiplier = self.config.get('exit.trailing_stop.atr_multiplier', 2.0)
+        atr_multiplier = self.trailing_atr_multiplier
         initial_percent = position.get('initial_stop_percent', 2.5)
         
         # Calculate new stop
@@ -269,32 +355,40 @@ class PositionManager:
             # Long position
             if current_price > position.get('highest_price', position['entry_price']):
                 position['highest_price'] = current_price
+                changed = True
             
             new_trailing_stop = current_price - stop_distance
             
             # Only tighten, never loosen
             if old_stop is None or new_trailing_stop > old_stop:
                 position['trailing_stop'] = new_trailing_stop
+                changed = True
                 
                 if self.logger:
-                    self.logger.debug(f"Trailing stop updated {symbol}: {new_trailing_stop:.8f} (price: {current_price:.8f}, ATR: {atr_value:.8f if atr_value else 'N/A'})")
+                    self.logger.debug("Trailing stop updated %s: %.8f (price: %.8f, ATR: %s)", symbol, new_trailing_stop, current_price, atr_value or 'N/A')
         
         else:
             # Short position
             if current_price < position.get('lowest_price', position['entry_price']):
                 position['lowest_price'] = current_price
+                changed = True
             
             new_trailing_stop = current_price + stop_distance
             
             # Only tighten, never loosen
             if old_stop is None or new_trailing_stop < old_stop:
                 position['trailing_stop'] = new_trailing_stop
+                changed = True
                 
                 if self.logger:
-                    self.logger.debug(f"Trailing stop updated {symbol}: {new_trailing_stop:.8f} (price: {current_price:.8f}, ATR: {atr_value:.8f if atr_value else 'N/A'})")
+                    self.logger.debug("Trailing stop updated %s: %.8f (price: %.8f, ATR: %s)", symbol, new_trailing_stop, current_price, atr_value or 'N/A')
+        
+        # Only write back when the position actually changed
+        if not changed:
+            return
         
         try:
-            self.save_positions()
+            self._journal_position(symbol)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to save trailing stop update for {symbol}: {e}")
@@ -384,7 +478,7 @@ class PositionManager:
             del self.positions[symbol]
             
             try:
-                self.save_positions()
+                self._journal_position(symbol)
             except Exception as e:
                 self.positions[symbol] = position_backup
                 if self.logger:
@@ -10,6 +10,20 @@ class SignalGenerator:
         self.require_rsi_extreme = config.get('entry.require_rsi_extreme', True)
         self.require_heiken_ashi = config.get('entry.require_heiken_ashi', True)
         
+        # Indicator flags that must all be true, resolved once from the entry settings
+        # Volatility filter is always required
+        self.buy_condition_keys = [key for key, required in (
+            ('ema_crossover_up', self.require_ema_crossover),
+            ('rsi_oversold', self.require_rsi_extreme),
+            ('ha_bullish', self.require_heiken_ashi),
+        ) if required] + ['passes_volatility_filter']
+        
+        self.sell_condition_keys = [key for key, required in (
+            ('ema_crossover_down', self.require_ema_crossover),
+            ('rsi_overbought', self.require_rsi_extreme),
+            ('ha_bearish', self.require_heiken_ashi),
+        ) if required] + ['passes_volatility_filter']
+        
         # Exit settings
         self.use_rsi_reversal = config.get('exit.use_rsi_reversal', True)
         self.rsi_reversal_buy_threshold = config.get('exit.rsi_reversal_buy_threshold', 30)
@@ -47,8 +61,6 @@ class SignalGenerator:
         ema_crossover_up = indicators.get('ema_crossover_up', False)
         ema_crossover_down = indicators.get('ema_crossover_down', False)
         rsi = indicators.get('rsi')
-        rsi_oversold = indicators.get('rsi_oversold', False)
-        rsi_overbought = indicators.get('rsi_overbought', False)
         ha_bullish = indicators.get('ha_bullish', False)
         ha_bearish = indicators.get('ha_bearish', False)
         passes_volatility = indicators.get('passes_volatility_filter', False)
@@ -58,41 +70,13 @@ class SignalGenerator:
             return 'HOLD'
         
         # BUY signal logic
-        buy_conditions = []
-        
-        if self.require_ema_crossover:
-            buy_conditions.append(ema_crossover_up)
-        
-        if self.require_rsi_extreme:
-            buy_conditions.append(rsi_oversold)
-        
-        if self.require_heiken_ashi:
-            buy_conditions.append(ha_bullish)
-        
-        # Volatility filter is always required
-        buy_conditions.append(passes_volatility)
-        
-        if all(buy_conditions):
+        if all(indicators.get(key, False) for key in self.buy_condition_keys):
             if self.logger:
                 self.logger.info(f"BUY signal generated: EMA crossover={ema_crossover_up}, RSI={rsi:.2f}, HA bullish={ha_bullish}, Volatility OK={passes_volatility}")
             return 'BUY'
         
         # SELL signal logic
-        sell_conditions = []
-        
-        if self.require_ema_crossover:
-            sell_conditions.append(ema_crossover_down)
-        
-        if self.require_rsi_extreme:
-            sell_conditions.append(rsi_overbought)
-        
-        if self.require_heiken_ashi:
-            sell_conditions.append(ha_bearish)
-        
-        # Volatility filter is always required
-        sell_conditions.append(passes_volatility)
-        
-        if all(sell_conditions):
+        if all(indicators.get(key, False) for key in self.sell_condition_keys):
             if self.logger:
                 self.logger.info(f"SELL signal generated: EMA crossover={ema_crossover_down}, RSI={rsi:.2f}, HA bearish={ha_bearish}, Volatility OK={passes_volatility}")
             return 'SELL'
@@ -0,0 +1,101 @@
+import threading
+import time
+from binance import ThreadedWebsocketManager
+
+class StreamManager:
+    def __init__(self, binance_client, symbols, interval='15m', testnet=False, logger=None, stale_after_seconds=30):
+        self.client = binance_client
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.testnet = testnet
+        self.logger = logger
+        self.stale_after_seconds = stale_after_seconds
+        
+        # Latest market data pushed by the streams
+        self.latest_price = {}
+        self.latest_quote_volume = {}
+        self.last_price_update = 0
+        self.last_kline_update = {}
+        
+        # Set whenever a candle closes on any subscribed symbol
+        self.candle_closed = threading.Event()
+        
+        self._twm = None
+    
+    def start(self):
+        """Start the multiplex socket for all-market mini tickers and per-symbol klines"""
+        streams = ['!miniTicker@arr'] + [f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols]
+        
+        self._twm = ThreadedWebsocketManager(testnet=self.testnet)
+        self._twm.start()
+        self._twm.start_multiplex_socket(callback=self._handle_message, streams=streams)
+        
+        if self.logger:
+            self.logger.info(f"WebSocket streams started: tickers + {len(self.symbols)} kline streams ({self.interval})")
+    
+    def stop(self):
+        if self._twm:
+            self._twm.stop()
+            self._twm = None
+            if self.logger:
+                self.logger.info("WebSocket streams stopped")
+    
+    def _handle_message(self, msg):
+        try:
+            if msg.get('e') == 'error':
+                if self.logger:
+                    self.logger.error(f"WebSocket error: {msg.get('m')}")
+                return
+            
+            stream = msg.get('stream', '')
+            data = msg.get('data')
+            
+            if stream == '!miniTicker@arr':
+                for ticker in data:
+                    self.latest_price[ticker['s']] = float(ticker['c'])
+                    self.latest_quote_volume[ticker['s']] = ticker['q']
+                self.last_price_update = time.time()
+            
+            elif '@kline_' in stream:
+                kline = data['k']
+                symbol = kline['s']
+                
+                # Same row layout as the REST /klines endpoint
+                row = [
+                    kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'],
+                    kline['T'], kline['q'], kline['n'], kline['V'], kline['Q'], '0'
+                ]
+                
+                if self.client.apply_kline_update(symbol, self.interval, row):
+                    self.last_kline_update[symbol] = time.time()
+                
+                if kline['x']:
+                    self.candle_closed.set()
+        
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error handling WebSocket message: {e}")
+    
+    def has_fresh_prices(self):
+        return (time.time() - self.last_price_update) < self.stale_after_seconds
+    
+    def has_fresh_klines(self, symbol, interval):
+        if interval != self.interval:
+            return False
+        return (time.time() - self.last_kline_update.get(symbol, 0)) < self.stale_after_seconds
+    
+    def get_prices(self):
+        return dict(self.latest_price)
+    
+    def get_quote_volumes(self):
+        """24h rolling quote volume per symbol, as strings like the REST ticker"""
+        return dict(self.latest_quote_volume)
+    
+    def wait_for_candle_close(self, timeout):
+        """
+        Block until a candle closes or timeout expires
+        Returns True if woken by a candle close
+        """
+        closed = self.candle_closed.wait(timeout)
+        self.candle_closed.clear()
+        return closed